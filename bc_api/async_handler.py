@@ -0,0 +1,132 @@
+import asyncio
+import os
+import ssl
+import aiohttp
+import orjson
+from bc_api.handler import ERROR_BODY_LIMIT, BaseBCHandler, BCMetaData, BCData
+
+class AsyncBCHandler(BaseBCHandler):
+    """
+    Asynchronous handler for BC API operations.
+
+    Lets several requests run concurrently, e.g.
+    `await asyncio.gather(*[handler.get_data(company, t) for t in tables])`.
+    """
+
+    def __init__(self, tenant_id: str, env_name: str, endpoint_type: str, token: str,
+                 max_concurrency: int = 32):
+
+        super().__init__(tenant_id, env_name, endpoint_type, token)
+        self.max_concurrency = max_concurrency
+        # Verify TLS against BC_CA_BUNDLE (a file or a CA directory, as with requests) when set;
+        # one context is shared by all requests
+        ca_bundle = os.getenv('BC_CA_BUNDLE')
+        if ca_bundle and os.path.isdir(ca_bundle):
+            self._ssl = ssl.create_default_context(capath=ca_bundle)
+        else:
+            self._ssl = ssl.create_default_context(cafile=ca_bundle or None)
+        self._session = None
+        self._sem = None
+        self._loop = None
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        # Created lazily, together with the semaphore, so both bind to the running event loop
+        self._drop_stale_session()
+        if self._session is None or self._session.closed:
+            self._loop = asyncio.get_running_loop()
+            self._sem = asyncio.Semaphore(self.max_concurrency)
+            self._session = aiohttp.ClientSession(
+                headers=self.headers,
+                connector=aiohttp.TCPConnector(limit=2 * self.max_concurrency,
+                                               limit_per_host=self.max_concurrency)
+            )
+        return self._session
+
+    def _drop_stale_session(self):
+        # A session made under another (possibly closed) event loop cannot be used or closed
+        # from this one, so it is discarded rather than awaited
+        if self._session is not None and self._loop is not asyncio.get_running_loop():
+            self._session = None
+            self._sem = None
+            self._loop = None
+
+    async def close(self):
+        """Close the underlying session and release pooled connections."""
+        self._drop_stale_session()
+        if self._session is not None:
+            await self._session.close()
+        self._session = None
+        self._sem = None
+        self._loop = None
+
+    async def __aenter__(self):
+        self._drop_stale_session()
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+    async def get_metadata(self):
+        endpoint = self._metadata_endpoint()
+        response = await self._get(endpoint, json=False)
+        # Parsing is CPU-bound, so keep it off the event loop
+        metadata = await asyncio.to_thread(BCMetaData, response)
+        return metadata
+
+    async def get_companies(self):
+        endpoint = self._companies_endpoint()
+        response = await self._get(endpoint)
+        data = BCData(response)
+        return data
+
+    async def get_data(self, company_name: str, table_name: str):
+        """
+        Retrieve data from a specified table in Business Central.
+        
+        Args:
+            table_name: Name of the table to retrieve data from
+            
+        Returns:
+            dict: Data retrieved from the specified table
+            
+        Raises:
+            ValueError: If table name is invalid
+            Exception: For other errors during data retrieval
+        """
+        endpoint = self._data_endpoint(company_name, table_name)
+        response = await self._get(endpoint)
+        return response
+
+    async def _get(self, endpoint: str, json=True):
+        detail = None
+        try:
+            session = self.session  # Also (re)creates the semaphore for this loop
+            async with self._sem:
+                async with session.get(endpoint, ssl=self._ssl) as response:
+                    # raise_for_status releases the response, so read the error detail first
+                    if not response.ok:
+                        detail = await self._error_detail(response)
+                    response.raise_for_status()  # Raise exception for HTTP errors
+
+                    body = await response.read()
+
+        except aiohttp.ClientResponseError as e:
+            raise Exception(f"Failed to retrieve data: {e.status} {e.message} - {detail}") from e
+
+        # Decode after releasing the semaphore so parsing does not hold a request slot
+        if json:
+            return orjson.loads(body)
+        else:
+            return body
+
+    @staticmethod
+    async def _error_detail(response) -> str:
+        # Only a bounded slice is read, so large error bodies are not pulled in whole
+        body = b''
+        while len(body) < ERROR_BODY_LIMIT:
+            chunk = await response.content.read(ERROR_BODY_LIMIT - len(body))
+            if not chunk:
+                break
+            body += chunk
+        return body.decode('utf-8', errors='replace')
@@ -1,13 +1,28 @@
 import requests
+from requests.auth import HTTPBasicAuth
 from requests.exceptions import RequestException, Timeout, ConnectionError
 
 class BCTokenClient:
     """Client for retrieving BC tokens."""
     
-    def __init__(self, base_url: str = "192.168.70.231:4413", timeout: int = 30):
+    def __init__(self, base_url: str = "192.168.70.231:4413", timeout: int = 30, verify=False):
         self.base_url = base_url
         self.timeout = timeout
+        self.verify = verify  # Disabled by default for the internal token server; pass True or a CA bundle path
+        self.endpoint = f'https://{self.base_url}/bcWT/Token'
+        self.session = requests.Session()
+        self._auth = None
     
+    def close(self):
+        """Close the underlying session and release pooled connections."""
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
     def get_token(self, username: str, password: str) -> str:
         """
         Retrieve BC token using username and password.
@@ -27,12 +42,15 @@ class BCTokenClient:
         if not username or not password:
             raise ValueError("Username and password are required")
         
-        endpoint = f'https://{username}:{password}@{self.base_url}/bcWT/Token'
+        # Reuse the auth object while the credentials stay the same
+        if self._auth is None or (self._auth.username, self._auth.password) != (username, password):
+            self._auth = HTTPBasicAuth(username, password)
         
         try:
-            response = requests.get(
-                endpoint, 
-                verify=False,  # Consider using proper SSL certificates in production
+            response = self.session.get(
+                self.endpoint, 
+                auth=self._auth,
+                verify=self.verify,
                 timeout=self.timeout
             )
             response.raise_for_status()  # Raise exception for HTTP errors
@@ -1,17 +1,54 @@
+import io
+import os
+import sys
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import cached_property
+from urllib.parse import quote
+import ijson
+import orjson
+import pandas as pd
 import requests
-import xml.etree.ElementTree as ET
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from lxml import etree
+
+# Fully-qualified (Clark notation) names used when walking $metadata
+EDM = '{http://docs.oasis-open.org/odata/ns/edm}'
+TAG_ENTITY = EDM + 'EntityType'
+TAG_PROP = EDM + 'Property'
+TAG_ANN = EDM + 'Annotation'
+TAG_ENUM = EDM + 'EnumMember'
+
+ATTR_NAME = 'Name'
+ATTR_TYPE = 'Type'
+ATTR_NULLABLE = 'Nullable'
+ATTR_MAXLENGTH = 'MaxLength'
+ATTR_SCALE = 'Scale'
+ATTR_TERM = 'Term'
+ATTR_STRING = 'String'
+ATTR_BOOL = 'Bool'
+
+# Pads annotation columns for rows that lack the annotation; None is a real annotation value
+_MISSING = object()
+
+# Bytes of an error response body kept in exception messages; BC puts the diagnosis there
+ERROR_BODY_LIMIT = 500
+
+# Leading columns of every flattened metadata row, interned so all rows share the key objects
+BASE_COLUMNS = tuple(sys.intern(k) for k in ('API Endpoint Name', 'Column Name', 'DataType', 'Nullable', 'MaxLength', 'Scale'))
+
+class BaseBCHandler:
+    """Endpoint configuration shared by the sync and async BC handlers."""
 
-class BCHandler:
-    """Handler for BC API operations."""
-    
     def __init__(self, tenant_id: str, env_name: str, endpoint_type: str, token: str):
-        
+
         self.base_url = "https://api.businesscentral.dynamics.com/v2.0/"
         self.tenant_id = tenant_id
         self.env_name = env_name
         self.token = token
         self.headers = {'Authorization': f'Bearer {self.token}'}
-        self.endpoint_type = endpoint_type
         self.set_endpoint_type(endpoint_type)
 
     def set_endpoint_type(self, type: str):
@@ -34,15 +71,111 @@ class BCHandler:
         else:
             raise ValueError("Invalid endpoint type. Choose 'ODataV4' or 'v2'.")
 
-    def get_metadata(self):
-        endpoint = self.endpoint_prefix + '$metadata'
-        response = self._get(endpoint, json=False)
-        metadata = BCMetaData(response)
-        return metadata
+        self.endpoint_type = type
+
+        # URLs that only depend on the endpoint type are built once here
+        suffix = "Company" if type == "ODataV4" else "companies"
+        self._metadata_url = self.endpoint_prefix + '$metadata'
+        self._companies_url = self.endpoint_prefix + suffix
+        self._company_prefixes = {}
+
+    def _company_prefix(self, company_name: str) -> str:
+        prefix = self._company_prefixes.get(company_name)
+        if prefix is None:
+            # OData escapes quotes inside string literals by doubling them
+            literal = quote(company_name.replace("'", "''"), safe='')
+            prefix = self._company_prefixes[company_name] = f"{self.endpoint_prefix}Company('{literal}')/"
+        return prefix
+
+    def _metadata_endpoint(self) -> str:
+        return self._metadata_url
+
+    def _companies_endpoint(self) -> str:
+        return self._companies_url
+
+    def _data_endpoint(self, company_name: str, table_name: str) -> str:
+        if not table_name:
+            raise ValueError("Table name is required")
+
+        return self._company_prefix(company_name) + table_name
+
+
+class BCHandler(BaseBCHandler):
+    """Handler for BC API operations."""
+    
+    def __init__(self, tenant_id: str, env_name: str, endpoint_type: str, token: str,
+                 metadata_ttl: float = 3600):
+        
+        super().__init__(tenant_id, env_name, endpoint_type, token)
+        self.metadata_ttl = metadata_ttl  # Seconds before get_metadata revalidates its cached result
+        self._pool_maxsize = 20
+        # Verify TLS against BC_CA_BUNDLE when set, otherwise the default CA bundle
+        self._verify = os.getenv('BC_CA_BUNDLE') or True
+
+        # Transient failures are retried with exponential backoff, honouring Retry-After.
+        # raise_on_status=False hands the last response back so raise_for_status reports it.
+        retry = Retry(
+            total=5,
+            backoff_factor=0.4,
+            status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=frozenset(['GET']),
+            respect_retry_after_header=True,
+            raise_on_status=False
+        )
+
+        # Shared session so repeated calls reuse pooled keep-alive connections
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        self.session.verify = self._verify
+        self.session.mount('https://', HTTPAdapter(max_retries=retry, pool_connections=4, pool_maxsize=self._pool_maxsize))
+
+    def set_endpoint_type(self, type: str):
+        super().set_endpoint_type(type)
+
+        # Any cached metadata belongs to the previous endpoint
+        self._metadata = None
+        self._metadata_etag = None
+        self._metadata_ts = 0.0
+
+    def close(self):
+        """Close the underlying session and release pooled connections."""
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def get_metadata(self, refresh: bool = False):
+        """
+        Retrieve and parse the $metadata document, reusing the last result for metadata_ttl seconds.
+        
+        Args:
+            refresh: Revalidate with the server even if the cached result has not expired
+            
+        Returns:
+            BCMetaData: Parsed metadata
+        """
+        now = time.monotonic()
+        if self._metadata is not None and not refresh and now - self._metadata_ts < self.metadata_ttl:
+            return self._metadata
+
+        # Let the server answer 304 Not Modified instead of resending an unchanged document
+        headers = {'If-None-Match': self._metadata_etag} if self._metadata is not None and self._metadata_etag else None
+
+        endpoint = self._metadata_endpoint()
+        with self._get(endpoint, stream=True, headers=headers) as response:
+            if response.status_code != 304:
+                response.raw.decode_content = True  # Let urllib3 undo gzip/deflate
+                self._metadata = BCMetaData(response.raw)
+                self._metadata_etag = response.headers.get('ETag')
+
+        self._metadata_ts = now
+        return self._metadata
 
     def get_companies(self):
-        suffix = "Company" if self.endpoint_type == "ODataV4" else "companies"
-        endpoint = self.endpoint_prefix + suffix
+        endpoint = self._companies_endpoint()
         response = self._get(endpoint)
         data = BCData(response)
         return data
@@ -61,102 +194,253 @@ class BCHandler:
             ValueError: If table name is invalid
             Exception: For other errors during data retrieval
         """
-        if not table_name:
-            raise ValueError("Table name is required")
-        
-        endpoint = self.endpoint_prefix + f"Company('{company_name}')/{table_name}"
+        endpoint = self._data_endpoint(company_name, table_name)
         response = self._get(endpoint)
         return response
 
-    def _get(self, endpoint: str, json=True):
+    def get_data_many(self, company_name: str, table_names: list, max_workers: int = 16) -> dict:
+        """
+        Retrieve data from several tables concurrently over the shared session.
+        
+        Args:
+            company_name: Name of the company the tables belong to
+            table_names: Names of the tables to retrieve data from
+            max_workers: Maximum number of concurrent requests, capped at the connection pool size
+            
+        Returns:
+            dict: Data retrieved for each table, keyed by table name
+            
+        Raises:
+            ValueError: If a table name is invalid
+            Exception: For other errors during data retrieval
+        """
+        table_names = list(dict.fromkeys(table_names))
+        if not table_names:
+            return {}
+
+        workers = min(max_workers, self._pool_maxsize, len(table_names))
+        executor = ThreadPoolExecutor(max_workers=workers)
         try:
-            response = requests.get(endpoint, headers=self.headers, verify=False)  # Consider using proper SSL certificates in production
-            response.raise_for_status()  # Raise exception for HTTP errors
+            futures = {executor.submit(self.get_data, company_name, table): table for table in table_names}
+            results = {}
+            for future in as_completed(futures):
+                results[futures[future]] = future.result()
+        except BaseException:
+            # Drop queued tables so the first error is raised without waiting on them
+            executor.shutdown(wait=False, cancel_futures=True)
+            raise
+
+        executor.shutdown()
+        return {table: results[table] for table in table_names}
+
+    def stream_data(self, company_name: str, table_name: str):
+        """
+        Retrieve data from a specified table, decoding records as they arrive.
+        
+        Args:
+            company_name: Name of the company the table belongs to
+            table_name: Name of the table to retrieve data from
             
-            if json:
-                return response.json()
-            else:
-                return response.content.decode('utf-8')
+        Returns:
+            BCData: Data whose flat_json is a one-shot generator of records
             
+        Raises:
+            ValueError: If table name is invalid
+            Exception: For other errors during data retrieval
+        """
+        endpoint = self._data_endpoint(company_name, table_name)
+        response = self._get(endpoint, stream=True)
+        data = BCData(self._iter_records(response))
+        return data
+
+    @staticmethod
+    def _iter_records(response):
+        # The connection goes back to the pool once the generator is exhausted or closed
+        with response:
+            response.raw.decode_content = True  # Let urllib3 undo gzip/deflate
+            yield from ijson.items(response.raw, 'value.item', use_float=True)
+
+    def _get(self, endpoint: str, json=True, stream=False, headers=None):
+        response = self.session.get(endpoint, headers=headers, verify=self._verify, stream=stream)
+
+        try:
+            response.raise_for_status()  # Raise exception for HTTP errors left after retries
         except requests.exceptions.HTTPError as e:
-            raise Exception(f"Failed to retrieve data: {e.response.status_code} - {e.response.text}")
-        
-        except Exception as e:
-            raise Exception(f"An error occurred while retrieving data: {str(e)}")
+            detail = self._error_detail(response, stream)
+            response.close()
+            raise Exception(f"Failed to retrieve data: {response.status_code} {response.reason} - {detail}") from e
+
+        if stream:
+            return response
+        elif json:
+            return orjson.loads(response.content)
+        else:
+            # Raw bytes: lxml reads the encoding from the XML declaration itself
+            return response.content
+
+    @staticmethod
+    def _error_detail(response, stream: bool) -> str:
+        # Only a bounded slice is read, so streamed bodies are not pulled in whole
+        if stream:
+            body = next(response.iter_content(ERROR_BODY_LIMIT), b'')
+        else:
+            body = response.content
+        return body[:ERROR_BODY_LIMIT].decode('utf-8', errors='replace')
         
 
 class BCMetaData:
 
     def __init__(self, xml_metadata):
-        self.raw = xml_metadata
-        self._process_xml(self.raw)
+        # Only in-memory documents are kept; streams are consumed by parsing
+        self.raw = xml_metadata if isinstance(xml_metadata, (str, bytes)) else None
+        self._process_xml(xml_metadata)
 
     def _process_xml(self, xml_metadata):
         """
         Parse the xml metadata file from Business Central
+
+        Accepts a str, bytes or a binary file-like object. EntityType elements
+        are handled one at a time and discarded, so memory use does not grow
+        with the size of the whole schema.
         """
 
-        ns = {
-            'edmx': 'http://docs.oasis-open.org/odata/ns/edmx',
-            'edm': 'http://docs.oasis-open.org/odata/ns/edm'
-        }
+        if isinstance(xml_metadata, str):
+            xml_metadata = xml_metadata.encode('utf-8')
+        if isinstance(xml_metadata, bytes):
+            xml_metadata = io.BytesIO(xml_metadata)
+
+        names, cols, types, nulls, maxlens, scales = [], [], [], [], [], []
+        ann_cols = defaultdict(list)
 
-        root = ET.fromstring(xml_metadata)
+        # Collect one list per column while walking the element tree
+        base_cols = (names, cols, types, nulls, maxlens, scales)
+        entity_names = {}  # Ordered set, so entities without properties still appear in json
+        replaced = False
 
-        entities = {}
+        for _, entity in etree.iterparse(xml_metadata, events=('end',), tag=TAG_ENTITY):
+            entity_name = entity.get(ATTR_NAME)
+            entity_names[entity_name] = None
+            prop_rows = {}
 
-        # Parse element tree into JSON
-        for entity in root.findall('.//edm:EntityType', ns):
-            entity_name = entity.attrib.get('Name')
-            entities[entity_name] = {}
+            for prop in entity.iterchildren(TAG_PROP):
+                prop_name = prop.get(ATTR_NAME)
+                values = (entity_name, prop_name, prop.get(ATTR_TYPE), prop.get(ATTR_NULLABLE),
+                          prop.get(ATTR_MAXLENGTH), prop.get(ATTR_SCALE))
 
-            for prop in entity.findall('edm:Property', ns):
-                prop_name = prop.attrib.get('Name')
-                prop_type = prop.attrib.get('Type')
-                prop_null = prop.attrib.get('Nullable')
-                prop_maxlen = prop.attrib.get('MaxLength')
-                prop_scale = prop.attrib.get('Scale')
+                i = prop_rows.get(prop_name)
+                if i is None:
+                    i = prop_rows[prop_name] = len(names)
+                    for col, value in zip(base_cols, values):
+                        col.append(value)
+                else:
+                    # A repeated property name replaces the earlier definition in place
+                    replaced = True
+                    for col, value in zip(base_cols, values):
+                        col[i] = value
+                    for col in ann_cols.values():
+                        if len(col) > i:
+                            col[i] = _MISSING
 
-                annotations = {}
-                for ann in prop.findall('edm:Annotation', ns):
-                    term = ann.attrib.get('Term')
-                    value = ann.attrib.get('String') or ann.attrib.get('Bool')
-                    enum = ann.find('edm:EnumMember', ns)
+                for ann in prop.iterchildren(TAG_ANN):
+                    term = ann.get(ATTR_TERM)
+                    value = ann.get(ATTR_STRING) or ann.get(ATTR_BOOL)
+                    enum = ann.find(TAG_ENUM)
                     if enum is not None:
                         value = enum.text
-                    annotations[term] = value
 
-                entities[entity_name][prop_name] = {
-                    'Type': prop_type,
-                    'Nullable': prop_null,
-                    'MaxLength': prop_maxlen,
-                    'Scale': prop_scale,
-                    'Annotations': annotations
-                }
+                    # Pad rows that lack this annotation; a repeated term overwrites
+                    col = ann_cols[f'Annotations.{term}']
+                    if len(col) > i:
+                        col[i] = value
+                    else:
+                        col.extend([_MISSING] * (i - len(col)))
+                        col.append(value)
+
+            # Free the processed entity and any siblings already handled
+            entity.clear()
+            while entity.getprevious() is not None:
+                del entity.getparent()[0]
+
+        for col in ann_cols.values():
+            col.extend([_MISSING] * (len(names) - len(col)))
+
+        if replaced:
+            # Replaced definitions can leave annotation columns no row uses, or out of first-use
+            # order; drop and reorder them so df lines up with flat_json
+            first_use = {
+                k: next((j for j, v in enumerate(col) if v is not _MISSING), None)
+                for k, col in ann_cols.items()
+            }
+            used = [k for k, j in first_use.items() if j is not None]
+            ann_cols = {k: ann_cols[k] for k in sorted(used, key=first_use.get)}
+
+        self._entity_names = list(entity_names)
+        self._columns = dict(zip(BASE_COLUMNS, base_cols))
+        self._columns.update((sys.intern(k), col) for k, col in ann_cols.items())
+
+    @cached_property
+    def df(self):
+        """
+        Tabular view of the metadata, built from the parsed columns on first access.
+        """
+        n_base = len(BASE_COLUMNS)
+        columns = {
+            k: col if j < n_base else [None if v is _MISSING else v for v in col]
+            for j, (k, col) in enumerate(self._columns.items())
+        }
+        return pd.DataFrame(columns)
+
+    @cached_property
+    def flat_json(self):
+        """
+        Row-wise view of the metadata, built from the parsed columns on first access.
 
-        # Process JSON into flattened JSON that can be normalized
+        Annotation keys are only present on rows that carry that annotation.
+        """
+        n_base = len(BASE_COLUMNS)
+        ann_keys = list(self._columns)[n_base:]
         rows = []
 
-        for prop, info in entities.items():
-            for field, details in info.items():
-                row = {'API Endpoint Name': prop}
-                row['Column Name'] = field
-                row['DataType'] = details.get('Type', None)
-                row['Nullable'] = details.get('Nullable', None)
-                row['MaxLength'] = details.get('MaxLength', None)
-                row['Scale'] = details.get('Scale', None)
-                for k, v in details.get('Annotations', {}).items():
-                    row[f'Annotations.{k}'] = v
-                rows.append(row)
-
-        self.json = entities
-        self.flat_json = rows
+        for values in zip(*self._columns.values()):
+            row = dict(zip(BASE_COLUMNS, values))
+            for k, v in zip(ann_keys, values[n_base:]):
+                if v is not _MISSING:
+                    row[k] = v
+            rows.append(row)
+
+        return rows
+
+    @cached_property
+    def json(self):
+        """
+        Nested view of the metadata, built from the parsed columns on first access.
+        """
+        entities = {name: {} for name in self._entity_names}
+        n_base = len(BASE_COLUMNS)
+        prefix_len = len('Annotations.')
+        ann_terms = [k[prefix_len:] for k in list(self._columns)[n_base:]]
+
+        for values in zip(*self._columns.values()):
+            entity_name, prop_name, prop_type, prop_null, prop_maxlen, prop_scale = values[:n_base]
+            entities[entity_name][prop_name] = {
+                'Type': prop_type,
+                'Nullable': prop_null,
+                'MaxLength': prop_maxlen,
+                'Scale': prop_scale,
+                'Annotations': {t: v for t, v in zip(ann_terms, values[n_base:]) if v is not _MISSING}
+            }
+
+        return entities
 
 class BCData:
 
     def __init__(self, json_data):
-        self.raw = json_data
-        self._process_data(self.raw)
+        # Streamed records are consumed by the caller, so only parsed payloads are kept
+        self.raw = json_data if isinstance(json_data, dict) else None
+        self._process_data(json_data)
 
     def _process_data(self, json_data):
-        self.flat_json = json_data.get('value', [])
\ No newline at end of file
+        if isinstance(json_data, dict):
+            self.flat_json = json_data.get('value', [])
+        else:
+            self.flat_json = json_data
\ No newline at end of file